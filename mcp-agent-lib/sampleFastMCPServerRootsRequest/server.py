@@ -1,9 +1,32 @@
 from fastmcp import FastMCP
 from fastmcp.server import Context
+import asyncio
 import os
+from urllib.parse import urlparse
+from urllib.request import url2pathname
 
 mcp = FastMCP("Roots Example Server")
 
+def _count_files(path: str) -> int:
+    """디렉토리 하위의 파일 개수를 scandir로 계산합니다."""
+    file_count = 0
+    stack = [path]
+    while stack:
+        directory = stack.pop()
+        try:
+            with os.scandir(directory) as entries:
+                for entry in entries:
+                    # os.walk와 동일하게 디렉토리 심볼릭 링크는 세지도 따라가지도 않음
+                    if entry.is_dir():
+                        if not entry.is_symlink():
+                            stack.append(entry.path)
+                    else:
+                        file_count += 1
+        except OSError:
+            # 읽을 수 없는 디렉토리는 건너뜀
+            continue
+    return file_count
+
 @mcp.tool
 async def list_accessible_roots(ctx: Context) -> str:
     """클라이언트가 제공한 roots를 조회합니다."""
@@ -36,11 +59,11 @@ async def count_files_in_root(root_index: int, ctx: Context) -> str:
     selected_root = roots[root_index - 1]
     uri = str(selected_root.uri)  # FileUrl 객체를 문자열로 변환
 
-    # file:// 제거하고 실제 경로 추출
-    if uri.startswith("file://"):
-        path = uri[7:]  # "file://" 제거
-    else:
+    # file URI에서 실제 경로 추출 (퍼센트 인코딩, Windows 경로 처리 포함)
+    parsed = urlparse(uri)
+    if parsed.scheme != "file":
         return f"지원하지 않는 URI 스키마입니다: {uri}"
+    path = url2pathname(parsed.path)
 
     try:
         # 파일/디렉토리 확인
@@ -50,10 +73,8 @@ async def count_files_in_root(root_index: int, ctx: Context) -> str:
         if os.path.isfile(path):
             return f"단일 파일입니다: {selected_root.name or path}"
 
-        # 디렉토리의 파일 개수 계산
-        file_count = 0
-        for root, dirs, files in os.walk(path):
-            file_count += len(files)
+        # 디렉토리의 파일 개수 계산 (이벤트 루프를 막지 않도록 별도 스레드에서 실행)
+        file_count = await asyncio.to_thread(_count_files, path)
 
         return f"Root '{selected_root.name or path}'에 총 {file_count}개의 파일이 있습니다."
 
@@ -10,25 +10,98 @@ import ast
 import sys
 import json
 import os
-import importlib.util
-import pkgutil
+import re
+import mmap
+import hashlib
+import time
+import functools
 
-class ImportAnalyzer(ast.NodeVisitor):
-    def __init__(self):
-        self.imports = set()
-        self.from_imports = set()
-        
-    def visit_Import(self, node):
-        """import module 형태 처리"""
-        for alias in node.names:
-            self.imports.add(alias.name)
-        self.generic_visit(node)
-    
-    def visit_ImportFrom(self, node):
-        """from module import ... 형태 처리"""
-        if node.module:
-            self.from_imports.add(node.module)
-        self.generic_visit(node)
+# orjson이 설치되어 있으면 더 빠른 직렬화에 사용
+try:
+    import orjson
+
+    def _dumps(obj, indent=False):
+        """JSON 문자열로 직렬화 (orjson)"""
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 if indent else 0).decode('utf-8')
+except ImportError:
+    def _dumps(obj, indent=False):
+        """JSON 문자열로 직렬화 (표준 json)"""
+        return json.dumps(obj, ensure_ascii=False, indent=2 if indent else None)
+
+# Python 3.10+ 에서 제공하는 표준 라이브러리 최상위 모듈 목록
+_STDLIB_MODULE_NAMES = getattr(sys, 'stdlib_module_names', frozenset())
+
+# 자주 쓰이는 표준 라이브러리 모듈 목록
+_STDLIB_MODULES = frozenset({
+    'os', 'sys', 'json', 'ast', 'collections', 'itertools', 'functools',
+    'datetime', 'time', 're', 'math', 'random', 'hashlib', 'base64',
+    'urllib', 'http', 'socket', 'threading', 'subprocess', 'pathlib',
+    'io', 'csv', 'xml', 'html', 'email', 'logging', 'argparse',
+    'configparser', 'pickle', 'sqlite3', 'uuid', 'copy', 'weakref',
+    'gc', 'traceback', 'warnings', 'typing', 'enum', 'dataclasses',
+    'contextlib', 'operator', 'heapq', 'bisect', 'array', 'struct',
+    'codecs', 'locale', 'gettext', 'calendar', 'sched', 'queue',
+    'threading', 'multiprocessing', 'concurrent', 'asyncio', 'ssl',
+    'ftplib', 'poplib', 'imaplib', 'smtplib', 'telnetlib', 'socketserver',
+    'xmlrpc', 'gzip', 'bz2', 'lzma', 'zipfile', 'tarfile', 'tempfile',
+    'shutil', 'glob', 'fnmatch', 'stat', 'filecmp', 'mmap'
+})
+
+# import 키워드 존재 여부 사전 확인용 (키워드가 없으면 import 구문도 없음)
+_IMPORT_RE = re.compile(r'\bimport\b')
+_IMPORT_RE_BYTES = re.compile(rb'\bimport\b')
+
+# AST만 생성하는 compile 플래그 (최상위 await도 허용)
+_AST_FLAGS = ast.PyCF_ONLY_AST | ast.PyCF_ALLOW_TOP_LEVEL_AWAIT
+
+# import 구문은 문(stmt) 안에만 존재하므로 문을 담는 필드만 따라 내려갑니다.
+_STMT_FIELDS = ('body', 'orelse', 'finalbody', 'handlers', 'cases')
+
+# 분석 결과 형식이나 판별 로직이 바뀌면 올려서 기존 캐시를 무효화
+_CACHE_VERSION = 2
+
+# 파일 내용 해시로 분석 결과를 저장하는 캐시 디렉토리
+# (표준 라이브러리 판별이 인터프리터 버전에 따라 달라지므로 버전별로 분리)
+_CACHE_DIR = os.path.join(
+    os.path.expanduser('~'), '.aiexe', 'cache', 'import_analyzer',
+    f'v{_CACHE_VERSION}-py{sys.version_info.major}{sys.version_info.minor}'
+)
+
+# 캐시는 배치 모드에서만 기본 사용 (이 환경변수가 1이면 항상 사용, 0이면 항상 사용 안 함)
+_CACHE_ENV = 'IMPORT_ANALYZER_CACHE'
+
+# 캐시 파일 최대 개수 (초과하면 오래 쓰이지 않은 항목부터 삭제)
+_CACHE_MAX_ENTRIES = 1000
+
+# 중단된 쓰기로 남은 임시 파일 삭제 기준 (진행 중인 다른 프로세스의 쓰기와 겹치지 않도록 여유를 둠)
+_CACHE_TEMP_MAX_AGE = 3600
+
+# 노드 클래스별로 위 필드 중 실제 가진 필드만 캐시 (Assign 같은 단순 문은 빈 튜플)
+_CHILD_FIELDS = {}
+
+def collect_imports(tree):
+    """AST에서 import 구문의 모듈명 수집 (표현식 하위 트리는 건너뜀)"""
+    imports = set()
+    from_imports = set()
+    stack = [tree]
+    while stack:
+        node = stack.pop()
+        t = type(node)
+        if t is ast.Import:
+            # import module 형태 처리
+            imports.update(alias.name for alias in node.names)
+            continue
+        if t is ast.ImportFrom:
+            # from module import ... 형태 처리
+            if node.module:
+                from_imports.add(node.module)
+            continue
+        fields = _CHILD_FIELDS.get(t)
+        if fields is None:
+            fields = _CHILD_FIELDS[t] = tuple(f for f in t._fields if f in _STMT_FIELDS)
+        for field in fields:
+            stack.extend(getattr(node, field))
+    return imports, from_imports
 
 def get_top_level_package(module_name):
     """모듈명에서 최상위 패키지명 추출"""
@@ -36,77 +109,58 @@ def get_top_level_package(module_name):
         return module_name.split('.')[0]
     return module_name
 
+@functools.lru_cache(maxsize=None)
 def is_standard_library(module_name):
     """표준 라이브러리인지 확인"""
-    stdlib_modules = {
-        'os', 'sys', 'json', 'ast', 'collections', 'itertools', 'functools',
-        'datetime', 'time', 're', 'math', 'random', 'hashlib', 'base64',
-        'urllib', 'http', 'socket', 'threading', 'subprocess', 'pathlib',
-        'io', 'csv', 'xml', 'html', 'email', 'logging', 'argparse',
-        'configparser', 'pickle', 'sqlite3', 'uuid', 'copy', 'weakref',
-        'gc', 'traceback', 'warnings', 'typing', 'enum', 'dataclasses',
-        'contextlib', 'operator', 'heapq', 'bisect', 'array', 'struct',
-        'codecs', 'locale', 'gettext', 'calendar', 'sched', 'queue',
-        'threading', 'multiprocessing', 'concurrent', 'asyncio', 'ssl',
-        'ftplib', 'poplib', 'imaplib', 'smtplib', 'telnetlib', 'socketserver',
-        'xmlrpc', 'gzip', 'bz2', 'lzma', 'zipfile', 'tarfile', 'tempfile',
-        'shutil', 'glob', 'fnmatch', 'stat', 'filecmp', 'mmap'
-    }
-    
     top_level = get_top_level_package(module_name)
     
-    # 표준 라이브러리에 포함된 모듈인지 확인
-    if top_level in stdlib_modules:
-        return True
-    
-    # 추가 확인: importlib을 사용한 정확한 확인
-    try:
-        spec = importlib.util.find_spec(top_level)
-        if spec and spec.origin:
-            # 표준 라이브러리 경로에 있는지 확인
-            stdlib_path = os.path.dirname(os.__file__)
-            return spec.origin.startswith(stdlib_path)
-    except (ImportError, ModuleNotFoundError, ValueError):
-        pass
-    
-    return False
+    # 인터프리터가 제공하는 목록으로 판별 (_STDLIB_MODULES는 3.10 미만 호환용)
+    return (top_level in _STDLIB_MODULE_NAMES
+            or top_level in sys.builtin_module_names
+            or top_level in _STDLIB_MODULES)
 
 def analyze_python_code(code_text):
-    """Python 코드를 AST로 분석하여 사용된 패키지 추출"""
+    """Python 코드를 AST로 분석하여 사용된 패키지 추출
+    
+    import 키워드가 없는 코드는 파싱하지 않으므로 구문 오류도 검사하지 않습니다.
+    이 경우 결과의 'parsed'가 False이며, 구문 검사까지 마친 결과는 True입니다.
+    """
     try:
-        # AST 파싱
-        tree = ast.parse(code_text)
-        
-        # Import 분석
-        analyzer = ImportAnalyzer()
-        analyzer.visit(tree)
+        import_re = _IMPORT_RE if isinstance(code_text, str) else _IMPORT_RE_BYTES
+        if import_re.search(code_text) is None:
+            # import 키워드가 없으면 AST 파싱 생략 (구문 오류 검사도 생략됨)
+            parsed = False
+            imports, from_imports = set(), set()
+        else:
+            parsed = True
+            
+            # AST 파싱
+            tree = compile(code_text, '<string>', 'exec', _AST_FLAGS, dont_inherit=True)
+            
+            # Import 분석
+            imports, from_imports = collect_imports(tree)
         
         # 모든 import된 모듈 수집
-        all_modules = set()
-        all_modules.update(analyzer.imports)
-        all_modules.update(analyzer.from_imports)
+        all_modules = imports | from_imports
         
         # 최상위 패키지명으로 변환
-        top_level_packages = set()
-        for module in all_modules:
-            top_level = get_top_level_package(module)
-            top_level_packages.add(top_level)
+        top_level_packages = {module.split('.', 1)[0] for module in all_modules}
         
         # 표준 라이브러리와 외부 패키지 구분
         external_packages = []
         standard_modules = []
         
-        for package in sorted(top_level_packages):
-            if is_standard_library(package):
-                standard_modules.append(package)
-            else:
-                external_packages.append(package)
+        for package in top_level_packages:
+            (standard_modules if is_standard_library(package) else external_packages).append(package)
+        external_packages.sort()
+        standard_modules.sort()
         
         return {
             'success': True,
+            'parsed': parsed,
             'external_packages': external_packages,
             'standard_modules': standard_modules,
-            'all_imports': sorted(list(all_modules)),
+            'all_imports': sorted(all_modules),
             'analysis_summary': {
                 'total_imports': len(all_modules),
                 'external_count': len(external_packages),
@@ -128,47 +182,139 @@ def analyze_python_code(code_text):
             'error_type': type(e).__name__
         }
 
-def main():
-    """메인 함수"""
-    if len(sys.argv) < 2:
-        print(json.dumps({
-            'success': False,
-            'error': '사용법: python ast-analyzer.py <python_file_path>',
-            'error_type': 'ArgumentError'
-        }))
-        return
+def load_cached_result(cache_key):
+    """캐시된 분석 결과 조회 (없거나 읽을 수 없으면 None)"""
+    try:
+        cache_path = os.path.join(_CACHE_DIR, f'{cache_key}.json')
+        with open(cache_path, 'r', encoding='utf-8') as f:
+            result = json.load(f)
+        # 최근 사용 시각 갱신 (prune_cache의 삭제 순서 기준)
+        os.utime(cache_path)
+        return result
+    except (OSError, ValueError):
+        return None
+
+def store_cached_result(cache_key, result):
+    """분석 결과를 캐시에 저장 (실패해도 분석에는 영향 없음)"""
+    cache_path = os.path.join(_CACHE_DIR, f'{cache_key}.json')
+    temp_path = f'{cache_path}.{os.getpid()}.tmp'
+    try:
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            f.write(_dumps(result))
+        os.replace(temp_path, cache_path)
+    except OSError:
+        try:
+            os.remove(temp_path)
+        except OSError:
+            pass
+
+def prune_cache():
+    """캐시 파일이 _CACHE_MAX_ENTRIES개를 넘으면 오래 쓰이지 않은 항목부터 삭제
     
-    file_path = sys.argv[1]
+    중단된 쓰기로 남은 오래된 임시 파일(*.tmp)도 함께 삭제합니다.
+    """
+    cached = []
+    stale = []
+    temp_cutoff = time.time() - _CACHE_TEMP_MAX_AGE
+    try:
+        with os.scandir(_CACHE_DIR) as entries:
+            for entry in entries:
+                if entry.name.endswith('.json'):
+                    cached.append((entry.stat().st_mtime, entry.path))
+                elif entry.name.endswith('.tmp') and entry.stat().st_mtime < temp_cutoff:
+                    stale.append(entry.path)
+    except OSError:
+        return
     
+    cached.sort()
+    stale.extend(cache_path for _, cache_path in cached[:len(cached) - _CACHE_MAX_ENTRIES])
+    for cache_path in stale:
+        try:
+            os.remove(cache_path)
+        except OSError:
+            pass
+
+def analyze_python_file(file_path, use_cache=False):
+    """Python 파일을 읽어 분석 결과 반환 (use_cache가 참이면 내용 해시 캐시 사용)"""
     if not os.path.exists(file_path):
-        print(json.dumps({
+        return {
             'success': False,
             'error': f'파일이 존재하지 않습니다: {file_path}',
-            'error_type': 'FileNotFoundError'
-        }))
-        return
+            'error_type': 'FileNotFoundError',
+            'analyzed_file': file_path
+        }
     
     try:
-        # 파일 읽기
-        with open(file_path, 'r', encoding='utf-8') as f:
-            code_text = f.read()
-        
-        # AST 분석 실행
-        result = analyze_python_code(code_text)
+        # 파일을 메모리 매핑하여 복사 없이 분석 (빈 파일은 mmap 불가)
+        with open(file_path, 'rb') as f:
+            if os.fstat(f.fileno()).st_size == 0:
+                result = analyze_python_code(b'')
+            else:
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as code_text:
+                    if not use_cache:
+                        # AST 분석 실행
+                        result = analyze_python_code(code_text)
+                    else:
+                        # 내용이 같은 파일은 캐시된 결과 재사용
+                        cache_key = hashlib.blake2b(code_text, digest_size=16).hexdigest()
+                        result = load_cached_result(cache_key)
+                        if result is None:
+                            result = analyze_python_code(code_text)
+                            if result['success']:
+                                store_cached_result(cache_key, result)
         result['analyzed_file'] = file_path
-        
-        # JSON 형태로 결과 출력
-        print(json.dumps(result, ensure_ascii=False, indent=2))
+        return result
         
     except Exception as e:
-        print(json.dumps({
+        return {
             'success': False,
             'error': f'파일 처리 오류: {str(e)}',
             'error_type': type(e).__name__,
             'analyzed_file': file_path
+        }
+
+def main():
+    """메인 함수
+    
+    - 파일 하나: 들여쓴 JSON 출력
+    - 파일 여러 개 또는 --stdin (줄 단위 경로 입력): 파일마다 JSON 한 줄씩 출력 (JSONL)
+    - 분석 결과 캐시는 배치 모드에서 기본 사용 (IMPORT_ANALYZER_CACHE=1이면 항상, 0이면 사용 안 함)
+    """
+    # --stdin은 단독으로만 사용 가능 (파일 경로와 함께 주면 사용법 오류)
+    stdin_mode = '--stdin' in sys.argv[1:]
+    if len(sys.argv) < 2 or (stdin_mode and len(sys.argv) > 2):
+        print(_dumps({
+            'success': False,
+            'error': '사용법: python import_analyzer.py <python_file_path> [...] | --stdin',
+            'error_type': 'ArgumentError'
         }))
+        return
+    
+    batch_mode = len(sys.argv) > 2 or stdin_mode
+    cache_setting = os.environ.get(_CACHE_ENV)
+    use_cache = cache_setting == '1' or (batch_mode and cache_setting != '0')
+    if use_cache:
+        try:
+            os.makedirs(_CACHE_DIR, exist_ok=True)
+        except OSError:
+            use_cache = False
+    
+    if not batch_mode:
+        # JSON 형태로 결과 출력
+        print(_dumps(analyze_python_file(sys.argv[1], use_cache), indent=True))
+    else:
+        if stdin_mode:
+            file_paths = (line.strip() for line in sys.stdin)
+        else:
+            file_paths = sys.argv[1:]
+        
+        # 배치 모드: 한 프로세스에서 여러 파일을 분석하여 JSONL로 출력
+        for file_path in file_paths:
+            if file_path:
+                print(_dumps(analyze_python_file(file_path, use_cache)), flush=True)
+    
+    if use_cache:
+        prune_cache()
 
 if __name__ == '__main__':
     main() 
-
-
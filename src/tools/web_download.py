@@ -1,52 +1,68 @@
 #!/usr/bin/env python3
 import requests
-import os
-from markitdown import MarkItDown
+from requests.adapters import HTTPAdapter, Retry
+from io import BytesIO
+from markitdown import MarkItDown, StreamInfo
 from urllib.parse import urljoin, urlparse
 import json
 import sys
 
-def fetch_and_convert(url, timeout=30, user_agent='Mozilla/5.0 (compatible; WebFetcher/1.0)', encoding='utf-8'):
+# 연결 재사용을 위한 공용 세션
+_SESSION = requests.Session()
+_ADAPTER = HTTPAdapter(
+    pool_connections=10,
+    pool_maxsize=10,
+    # Retry-After 값을 따르면 timeout과 무관하게 오래 대기할 수 있으므로 무시 (재시도 대기는 최대 0.9초)
+    max_retries=Retry(
+        total=2,
+        backoff_factor=0.3,
+        status_forcelist=[502, 503, 504],
+        respect_retry_after_header=False,
+    ),
+)
+_SESSION.mount('http://', _ADAPTER)
+_SESSION.mount('https://', _ADAPTER)
+
+# 변환기 등록 비용을 한 번만 치르도록 공용 MarkItDown 인스턴스 사용
+_MD = MarkItDown()
+
+def fetch_and_convert(url, timeout=30, user_agent='Mozilla/5.0 (compatible; WebFetcher/1.0)'):
     try:
         # 요청 헤더 설정
         headers = {
             'User-Agent': user_agent,
             'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
             'Accept-Language': 'en-US,en;q=0.5',
-            'Accept-Encoding': 'gzip, deflate',
+            # urllib3에 Brotli 디코더가 있을 때만 br 포함
+            'Accept-Encoding': requests.utils.DEFAULT_ACCEPT_ENCODING,
             'Connection': 'keep-alive',
         }
 
         # 웹 페이지 다운로드
         print(f"Fetching: {url}", file=sys.stderr)
-        response = requests.get(url, headers=headers, timeout=timeout)
+        response = _SESSION.get(url, headers=headers, timeout=timeout)
         response.raise_for_status()
 
         # 콘텐츠 타입 확인
         content_type = response.headers.get('content-type', '').lower()
         print(f"Content-Type: {content_type}", file=sys.stderr)
 
-        # HTML 콘텐츠 임시 저장
-        import tempfile
-        with tempfile.NamedTemporaryFile(mode='w', suffix='.html', encoding=encoding, delete=False) as temp_file:
-            temp_html_path = temp_file.name
-            temp_file.write(response.text)
+        # 서버가 명시한 charset만 사용 (response.text의 인코딩 추측 생략)
+        charset = response.encoding if 'charset=' in content_type else None
 
-        # MarkItDown으로 변환
-        md = MarkItDown()
+        # MarkItDown으로 변환 (다운로드한 본문을 메모리에서 바로 전달)
         print("Converting to markdown...", file=sys.stderr)
-        result = md.convert(temp_html_path)
-
-        # 임시 파일 삭제
-        os.remove(temp_html_path)
+        result = _MD.convert_stream(BytesIO(response.content), stream_info=StreamInfo(extension='.html', charset=charset))
 
         # 마크다운 내용 생성
-        markdown_content = f"# {result.title or 'Web Page'}\n\n"
-        markdown_content += f"**Original URL**: {url}\n"
-        markdown_content += f"**Fetched**: {response.headers.get('date', 'Unknown')}\n"
-        markdown_content += f"**Content-Type**: {content_type}\n\n"
-        markdown_content += "---\n\n"
-        markdown_content += result.text_content
+        markdown_content = (
+            f"# {result.title or 'Web Page'}\n\n"
+            f"**Original URL**: {url}\n"
+            f"**Fetched**: {response.headers.get('date', 'Unknown')}\n"
+            f"**Content-Type**: {content_type}\n\n"
+            "---\n\n"
+            f"{result.text_content}"
+        )
 
         # stdout으로 출력
         print(markdown_content)
@@ -62,13 +78,12 @@ def fetch_and_convert(url, timeout=30, user_agent='Mozilla/5.0 (compatible; WebF
 
 if __name__ == "__main__":
     if len(sys.argv) < 2:
-        print("Usage: python web_download.py <url> [timeout] [user_agent] [encoding]", file=sys.stderr)
+        print("Usage: python web_download.py <url> [timeout] [user_agent]", file=sys.stderr)
         sys.exit(1)
 
     url = sys.argv[1]
     timeout = int(sys.argv[2]) if len(sys.argv) > 2 else 30
     user_agent = sys.argv[3] if len(sys.argv) > 3 else 'Mozilla/5.0 (compatible; WebFetcher/1.0)'
-    encoding = sys.argv[4] if len(sys.argv) > 4 else 'utf-8'
 
-    success = fetch_and_convert(url, timeout, user_agent, encoding)
+    success = fetch_and_convert(url, timeout, user_agent)
     sys.exit(0 if success else 1)
\ No newline at end of file
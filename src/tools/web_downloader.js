@@ -24,9 +24,8 @@ export async function fetch_web_page({ url }) {
 
     const timeout = 30;
     const user_agent = 'Mozilla/5.0 (compatible; WebFetcher/1.0)';
-    const encoding = 'utf-8';
     const pythonCode = await safeReadFile(join(process.app_custom?.__dirname || process.cwd(), 'src', 'tools', 'web_download.py'), 'utf8');
-    const result = await execPythonCode(pythonCode, [url, timeout, user_agent, encoding]);
+    const result = await execPythonCode(pythonCode, [url, timeout, user_agent]);
 
     return {
         operation_successful: result.code === 0,